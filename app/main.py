@@ -3,19 +3,25 @@ FastAPI backend for the version tree viewer.
 
 Endpoints:
   GET /versions          → paginated linearized tree
+  GET /versions/all.ndjson → every node, streamed one JSON object per line
   GET /versions/{id}     → single node + its ancestry chain
   POST /versions/seed    → (dev) load sample data
+  POST /versions/append  → (dev) add a single version
   GET /                  → serve frontend HTML
 """
 from __future__ import annotations
+import gzip
+import hashlib
 import json
 from pathlib import Path
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import HTMLResponse, Response
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
-from .models import Version, PageResponse
+from .models import Version, LinearizedNode, PageResponse, VersionDetail
 from .tree import TreeBuilder
 
 # ── App setup ───────────────────────────────────────────────────────
@@ -24,6 +30,7 @@ app = FastAPI(
     description="Paginated, interactive version tree with ancestry highlighting.",
     version="1.0.0",
 )
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 # Resolve static directory — works locally and on Vercel
 def _find_static() -> Path:
@@ -38,24 +45,112 @@ def _find_static() -> Path:
 
 static_dir = _find_static()
 
-# Mount for local dev; on Vercel static files are served via explicit routes below
-try:
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-except Exception:
-    pass  # Vercel may not support StaticFiles mount — fallback routes handle it
+
+# ── Frontend assets (read once; served from memory) ─────────────────
+def _load_asset(relative_path: str) -> tuple[bytes, str]:
+    """Read a static file and compute its ETag.
+
+    The tag is weak because GZipMiddleware may serve the same asset
+    gzip-encoded or as stored, and a strong tag must not span both.
+    """
+    content = (static_dir / relative_path).read_bytes()
+    return content, f'W/"{hashlib.sha1(content).hexdigest()}"'
+
+
+_INDEX_HTML, _INDEX_HTML_ETAG = _load_asset("index.html")
+_CSS, _CSS_ETAG = _load_asset("css/styles.css")
+_JS, _JS_ETAG = _load_asset("js/app.js")
+
+# Assets are not fingerprinted: HTML always revalidates, CSS/JS for an hour
+_HTML_CACHE_CONTROL = "no-cache"
+_ASSET_CACHE_CONTROL = "public, max-age=3600"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak If-None-Match comparison: W/ prefixes are ignored, * matches anything."""
+    opaque = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def _asset_response(
+    request: Request,
+    content: bytes,
+    etag: str,
+    media_type: str,
+    cache_control: str,
+) -> Response:
+    """Serve an in-memory asset, answering conditional GETs with 304."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
 
 # ── In-memory store (swap for DB later) ─────────────────────────────
 _versions: list[Version] = []
 _builder: Optional[TreeBuilder] = None
 _linearized = None   # cached full linearized list
+_by_id: dict[str, LinearizedNode] = {}   # version id → linearized node
+_total_nodes: int = 0
+_total_pages: int = 1
+_page_payloads: list[dict] = []   # per-page PageResponse body as plain JSON types
+_page_cache: list[bytes] = []     # per-page serialized body (no selection)
+_page_cache_gz: list[bytes] = []  # gzip-compressed copies of _page_cache
+_ascii_tree_body = b'{"tree":"(empty)"}'   # serialized /versions/debug/tree response
 
 PAGE_SIZE = 10
 
 
 def _refresh_cache() -> None:
-    global _builder, _linearized
+    global _builder
     _builder = TreeBuilder(_versions)
+    _rebuild_views()
+
+
+def _rebuild_views() -> None:
+    """Recompute the id index and page caches from the current builder."""
+    global _linearized, _by_id, _total_nodes, _total_pages
+    global _page_payloads, _page_cache, _page_cache_gz, _ascii_tree_body
     _linearized = _builder.linearize()
+    _by_id = {n.version_id: n for n in _linearized}
+
+    # Pages only change on re-seed, so serialize each one up front and
+    # let /versions skip Pydantic entirely on the request path.
+    _total_nodes = len(_linearized)
+    _total_pages = (_total_nodes + PAGE_SIZE - 1) // PAGE_SIZE if _total_nodes else 1
+    _page_payloads = []
+    _page_cache = []
+    for page in range(1, _total_pages + 1):
+        start = (page - 1) * PAGE_SIZE
+        page_nodes = _linearized[start : start + PAGE_SIZE]
+        payload = {
+            "page": page,
+            "page_size": PAGE_SIZE,
+            "total_nodes": _total_nodes,
+            "total_pages": _total_pages,
+            "nodes": [n.model_dump(mode="json") for n in page_nodes],
+            "versions": {
+                n.version_id: _builder.version_of(n.version_id).model_dump(mode="json")
+                for n in page_nodes
+            },
+            "selected_id": None,
+            "highlighted_ids": [],
+        }
+        _page_payloads.append(payload)
+        _page_cache.append(orjson.dumps(payload))
+    _page_cache_gz = [gzip.compress(body, mtime=0) for body in _page_cache]
+
+    version_of = _builder.version_of
+    ascii_tree = "\n".join(
+        # connectors[:-1]: all except the final •
+        f'{"".join(n.connectors[:-1])} {version_of(n.version_id).name}  [{n.version_id}]'
+        for n in _linearized
+    ) or "(empty)"
+    _ascii_tree_body = orjson.dumps({"tree": ascii_tree})
 
 
 # ── Seed with sample data on startup ────────────────────────────────
@@ -78,7 +173,7 @@ def _load_sample_data() -> None:
         {"id": "v15", "parent_id": "v12","name": "v2.0 Release",       "description": "GA release with SSO + 2FA",   "type": "RELEASE", "created_by": "alice", "created_at": "2024-01-25T10:00:00"},
     ]
     _versions.clear()
-    _versions.extend([Version(**v) for v in sample])
+    _versions.extend([Version.model_validate(v) for v in sample])
     _refresh_cache()
 
 
@@ -86,57 +181,102 @@ _load_sample_data()
 
 
 # ── Routes ───────────────────────────────────────────────────────────
+# Handlers stay `async def`: they only read the in-memory caches above, so
+# there is nothing to block the event loop. An endpoint that ever does
+# blocking I/O (e.g. a DB call) should be a plain `def` instead, which
+# FastAPI runs on its threadpool.
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
-async def serve_frontend():
-    html_path = static_dir / "index.html"
-    return HTMLResponse(content=html_path.read_text(encoding="utf-8"))
+async def serve_frontend(request: Request):
+    return _asset_response(
+        request, _INDEX_HTML, _INDEX_HTML_ETAG, "text/html; charset=utf-8", _HTML_CACHE_CONTROL
+    )
 
 
 @app.get("/static/css/styles.css", include_in_schema=False)
-async def serve_css():
-    content = (static_dir / "css" / "styles.css").read_text(encoding="utf-8")
-    return Response(content=content, media_type="text/css")
+async def serve_css(request: Request):
+    return _asset_response(
+        request, _CSS, _CSS_ETAG, "text/css; charset=utf-8", _ASSET_CACHE_CONTROL
+    )
 
 
 @app.get("/static/js/app.js", include_in_schema=False)
-async def serve_js():
-    content = (static_dir / "js" / "app.js").read_text(encoding="utf-8")
-    return Response(content=content, media_type="application/javascript")
+async def serve_js(request: Request):
+    return _asset_response(
+        request, _JS, _JS_ETAG, "application/javascript; charset=utf-8", _ASSET_CACHE_CONTROL
+    )
+
+
+# Mount for any other static files in local dev; registered after the
+# explicit routes above so those are served from memory.
+try:
+    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+except Exception:
+    pass  # Vercel may not support StaticFiles mount — fallback routes handle it
 
 
 # main.py
 
 @app.get("/versions", response_model=PageResponse,summary="Get paginated version tree ")
 async def get_versions(
+    request: Request,
     page: int = Query(default=1, ge=1),
     selected: Optional[str] = Query(default=None),
 ):
     if _linearized is None:
         raise HTTPException(500, "Tree not initialized")
 
-    page_nodes, total_pages = _builder.get_page(_linearized, page, PAGE_SIZE)
+    # Out-of-range pages clamp to the last page, as TreeBuilder.get_page does
+    index = min(page, _total_pages) - 1
+    if not selected:
+        # Serve the pre-compressed copy directly; GZipMiddleware leaves
+        # responses that already carry a Content-Encoding alone.
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(
+                content=_page_cache_gz[index],
+                media_type="application/json",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+        return Response(content=_page_cache[index], media_type="application/json")
 
     highlighted = []
-    if selected:
-        # Use the pre-cached linearized list to find ancestors
-        target = next((n for n in _linearized if n.version.id == selected), None)
-        if target:
-            # Path = selected node + its parent chain
-            highlighted = [selected] + target.ancestors
-
-    return PageResponse(
-        page=page,
-        page_size=PAGE_SIZE,
-        total_nodes=len(_linearized),
-        total_pages=total_pages,
-        nodes=page_nodes,
-        selected_id=selected,
-        highlighted_ids=highlighted
-    )
+    if selected in _by_id:
+        # Path = selected node + its parent chain
+        highlighted = [selected] + _builder.ancestors_of(selected)
+
+    body = orjson.dumps({
+        **_page_payloads[index],
+        "selected_id": selected,
+        "highlighted_ids": highlighted,
+    })
+    return Response(content=body, media_type="application/json")
+
+
+# Registered before /versions/{version_id} so the path isn't taken as an id
+@app.get("/versions/all.ndjson", summary="Stream the full linearized tree as NDJSON")
+async def get_all_versions():
+    """
+    Streams every node in DFS order, one {"node", "version"} object per line.
+    Unlike /versions this never buffers the whole tree into one body.
+    """
+    if _linearized is None:
+        raise HTTPException(500, "Tree not initialized")
+
+    # Snapshot: /versions/append splices into the cached list in place
+    nodes = list(_linearized)
+    version_of = _builder.version_of
 
+    async def lines():
+        for n in nodes:
+            yield orjson.dumps({
+                "node": n.model_dump(mode="json"),
+                "version": version_of(n.version_id).model_dump(mode="json"),
+            }) + b"\n"
 
-@app.get("/versions/{version_id}", summary="Get a single version with ancestry")
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/versions/{version_id}", response_model=VersionDetail, summary="Get a single version with ancestry")
 async def get_version(version_id: str):
     """
     Returns a single node plus its full ancestry chain.
@@ -145,14 +285,18 @@ async def get_version(version_id: str):
     if _linearized is None:
         raise HTTPException(500, "Tree not initialised")
 
-    node = next((n for n in _linearized if n.version.id == version_id), None)
+    node = _by_id.get(version_id)
     if not node:
         raise HTTPException(404, f"Version '{version_id}' not found")
 
-    ancestry_nodes = [
-        n for n in _linearized if n.version.id in node.ancestors
-    ]
-    return {"node": node, "ancestry": ancestry_nodes}
+    # ancestors_of is already ordered root → parent
+    ancestry_nodes = [_by_id[a] for a in _builder.ancestors_of(version_id)]
+    versions = {
+        n.version_id: _builder.version_of(n.version_id)
+        for n in (*ancestry_nodes, node)
+    }
+    # response_model validates on the way out; don't validate twice
+    return VersionDetail.model_construct(node=node, ancestry=ancestry_nodes, versions=versions)
 
 
 @app.post("/versions/seed", summary="(Dev) Replace data with custom versions")
@@ -161,16 +305,22 @@ async def seed_versions(versions: list[Version]):
     _versions.clear()
     _versions.extend(versions)
     _refresh_cache()
-    return {"loaded": len(_versions), "total_nodes": len(_linearized)}
+    return {"loaded": len(_versions), "total_nodes": _total_nodes}
+
+
+@app.post("/versions/append", summary="(Dev) Add a single version to the existing tree")
+async def append_version(version: Version):
+    """Add one version without rebuilding the tree from scratch."""
+    try:
+        _builder.add_version(version)
+    except ValueError as exc:
+        raise HTTPException(409, str(exc))
+    _versions.append(version)
+    _rebuild_views()
+    return {"loaded": len(_versions), "total_nodes": _total_nodes}
 
 
 @app.get("/versions/debug/tree", summary="(Dev) Print ASCII tree to response")
 async def debug_tree():
     """Returns the full tree as ASCII art for debugging."""
-    if not _linearized:
-        return {"tree": "(empty)"}
-    lines = []
-    for node in _linearized:
-        prefix = "".join(node.connectors[:-1])   # all except the final •
-        lines.append(f"{prefix} {node.version.name}  [{node.version.id}]")
-    return {"tree": "\n".join(lines)}
\ No newline at end of file
+    return Response(content=_ascii_tree_body, media_type="application/json")
\ No newline at end of file
@@ -4,8 +4,8 @@ Data models for the version tree system.
 from __future__ import annotations
 from enum import Enum
 from typing import Optional
-from datetime import datetime
-from pydantic import BaseModel, field_validator
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field, field_validator
 
 
 class VersionType(str, Enum):
@@ -23,7 +23,7 @@ class Version(BaseModel):
     description: Optional[str] = None          # added per spec
     type: VersionType = VersionType.TRUNK       # TRUNK | BRANCH | RELEASE
     created_by: str = "unknown"
-    created_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     @field_validator("id", "name")
     @classmethod
@@ -34,11 +34,11 @@ class Version(BaseModel):
 
 
 class LinearizedNode(BaseModel):
-    """A version node enriched with tree-display metadata."""
-    version: Version
-    depth: int                          
-    connectors: list[str]               # visual connector tokens per level
-    ancestors: list[str]                # ordered list of ancestor IDs (root → parent)
+    """Tree-display metadata for one version; the Version itself is shared."""
+    version_id: str
+    parent_id: Optional[str]            # parent in the displayed tree (None for roots, incl. orphans)
+    depth: int
+    connectors: tuple[str, ...]         # visual connector tokens per level
     is_last_child: bool                 # whether this is the final child of its parent
 
 
@@ -49,5 +49,12 @@ class PageResponse(BaseModel):
     total_nodes: int
     total_pages: int
     nodes: list[LinearizedNode]
+    versions: dict[str, Version]        # version records for the nodes on this page
     selected_id:Optional[str]=None
-    highlighted_ids:list[str]=[]
\ No newline at end of file
+    highlighted_ids:list[str]=[]
+
+class VersionDetail(BaseModel):
+    """Single-version API response: the node plus its ancestry chain."""
+    node: LinearizedNode
+    ancestry: list[LinearizedNode]      # ordered root → parent
+    versions: dict[str, Version]        # version records for node + ancestry
@@ -3,10 +3,12 @@ Tree construction and DFS linearization engine.
 
 Key ideas:
 - Build an adjacency list (parent_id → [children]) for O(1) child lookup.
-- DFS visits each node, tracking a "branch_open" stack of booleans.
-  Each boolean at index i means "level i still has more siblings coming".
+- DFS hands each node its finished connector tuple. A parent derives the
+  two possible child rows (├── / └──) once from its own connectors: an
+  upper level keeps │ while that level still has more siblings coming.
   This lets vertical │ lines persist correctly across page boundaries.
-- Pre-calculate ancestry for O(1) highlight lookups on click.
+- Nodes keep only their tree parent; ancestry is rebuilt on demand by
+  walking parent pointers (O(depth)) instead of storing a copy per node.
 """
 from __future__ import annotations
 from collections import defaultdict
@@ -20,6 +22,8 @@ CORNER     = "└──" # final child connector
 SPACE      = "   " # level is closed; just padding
 NODE_DOT   = "•"   # node indicator appended after connector
 
+ROOT_CONNECTORS = (NODE_DOT,)
+
 
 class TreeBuilder:
     """
@@ -27,7 +31,7 @@ class TreeBuilder:
 
     Usage:
         builder = TreeBuilder(versions)
-        nodes   = builder.linearize()   # full ordered list
+        nodes   = builder.linearize()   # full ordered list (memoized)
         page    = builder.get_page(nodes, page=2, page_size=10)
     """
 
@@ -35,10 +39,20 @@ class TreeBuilder:
         self._versions: dict[str, Version] = {v.id: v for v in versions}
         self._children: dict[Optional[str], list[str]] = defaultdict(list)
         self._roots: list[str] = []
+        self._linearized_cache: Optional[list[LinearizedNode]] = None
+        self._by_id: dict[str, LinearizedNode] = {}
 
         for v in versions:
             self._children[v.parent_id].append(v.id)
 
+        # Every version sits in exactly one children list (roots under None
+        # or their missing parent), so this covers all nodes.
+        self._is_last: dict[str, bool] = {}
+        for kids in self._children.values():
+            last = len(kids) - 1
+            for idx, child_id in enumerate(kids):
+                self._is_last[child_id] = idx == last
+
         # Roots are nodes whose parent_id is None (or whose parent doesn't exist)
         for v in versions:
             if v.parent_id is None or v.parent_id not in self._versions:
@@ -48,14 +62,63 @@ class TreeBuilder:
 
     def linearize(self) -> list[LinearizedNode]:
         """Return every node in DFS pre-order with display metadata."""
+        if self._linearized_cache is not None:
+            return self._linearized_cache
+
         result: list[LinearizedNode] = []
-        for root_id in self._roots:
-            self._dfs(
-                node_id=root_id,
-                ancestors=[],
-                branch_open=[],   # stack of booleans: True = level still has siblings
-                result=result,
+
+        # Explicit stack instead of recursion; frames are
+        # (node_id, parent_id, depth, connectors). Siblings share the
+        # connector tuples their parent built, so nothing is copied per node.
+        stack: list[tuple[str, Optional[str], int, tuple[str, ...]]] = [
+            (root_id, None, 0, ROOT_CONNECTORS) for root_id in reversed(self._roots)
+        ]
+
+        # Per-call memo: sibling groups with the same branch pattern share
+        # one pair of connector rows, and nothing outlives this tree.
+        rows: dict[
+            tuple[tuple[str, ...], bool], tuple[tuple[str, ...], tuple[str, ...]]
+        ] = {}
+
+        # Bind hot attributes to locals once; the loop runs N times
+        children_of = self._children.get
+        is_last_of = self._is_last.__getitem__
+        build_rows = self._child_connectors
+        cached_rows = rows.get
+        construct = LinearizedNode.model_construct
+        emit = result.append
+        push = stack.append
+        pop = stack.pop
+
+        while stack:
+            node_id, parent_id, depth, connectors = pop()
+            is_last = is_last_of(node_id)
+
+            # Trusted internal data: skip Pydantic validation on the hot path
+            emit(
+                construct(
+                    version_id=node_id,
+                    parent_id=parent_id,
+                    depth=depth,
+                    connectors=connectors,
+                    is_last_child=is_last,
+                )
             )
+
+            children = children_of(node_id)
+            if children:
+                key = (connectors, is_last)
+                child_rows = cached_rows(key)
+                if child_rows is None:
+                    child_rows = rows[key] = build_rows(connectors, is_last)
+                tee_row, corner_row = child_rows
+                child_depth = depth + 1
+                push((children[-1], node_id, child_depth, corner_row))
+                for idx in range(len(children) - 2, -1, -1):
+                    push((children[idx], node_id, child_depth, tee_row))
+
+        self._linearized_cache = result
+        self._by_id = {n.version_id: n for n in result}
         return result
 
     def get_page(
@@ -69,87 +132,113 @@ class TreeBuilder:
         Returns (page_nodes, total_pages).
         """
         total = len(linearized)
-        total_pages = max(1, -(-total // page_size))  # ceiling division
+        total_pages = (total + page_size - 1) // page_size if total else 1
         page = max(1, min(page, total_pages))
         start = (page - 1) * page_size
         return linearized[start : start + page_size], total_pages
 
     def lookup(self, node_id: str) -> Optional[LinearizedNode]:
-        """Return a single LinearizedNode by version id (after linearize())."""
-        # Re-linearize is cheap for small trees; cache if needed.
-        for node in self.linearize():
-            if node.version.id == node_id:
-                return node
-        return None
+        """Return a single LinearizedNode by version id (linearizes on first use)."""
+        if self._linearized_cache is None:
+            self.linearize()
+        return self._by_id.get(node_id)
 
-    # ── Private DFS ─────────────────────────────────────────────────
+    def ancestors_of(self, node_id: str) -> list[str]:
+        """
+        Return the ancestor ids of a node, ordered root → parent.
 
-    def _dfs(
-        self,
-        node_id: str,
-        ancestors: list[str],
-        branch_open: list[bool],
-        result: list[LinearizedNode],
-    ) -> None:
-        version = self._versions[node_id]
-        children = self._children.get(node_id, [])
-        depth = len(ancestors)
-        is_last = self._is_last_child(node_id)
-
-        connectors = self._build_connectors(branch_open, depth, is_last)
-
-        result.append(
-            LinearizedNode(
-                version=version,
-                depth=depth,
-                connectors=connectors,
-                ancestors=list(ancestors),
-                is_last_child=is_last,
-            )
-        )
+        Walks the tree parent pointers, so it costs O(depth). Unknown ids
+        (and versions unreachable from any root) have no ancestors.
+        """
+        node = self.lookup(node_id)
+        chain: list[str] = []
+        while node is not None and node.parent_id is not None:
+            chain.append(node.parent_id)
+            node = self._by_id[node.parent_id]
+        chain.reverse()
+        return chain
+
+    def version_of(self, node_id: str) -> Optional[Version]:
+        """Return the Version record for an id."""
+        return self._versions.get(node_id)
+
+    def add_version(self, version: Version) -> None:
+        """
+        Add a single version, as if it had been last in the constructor list.
 
-        # Recurse into children
-        for idx, child_id in enumerate(children):
-            child_is_last = idx == len(children) - 1
-            # Push: at this depth, are there more siblings after this child?
-            self._dfs(
-                node_id=child_id,
-                ancestors=ancestors + [node_id],
-                branch_open=branch_open + [not child_is_last],
-                result=result,
-            )
+        A new leaf under an existing childless parent is spliced straight
+        into the cached linearization; any other shape invalidates the
+        cache so the next linearize() runs a full DFS.
+        """
+        if version.id in self._versions:
+            raise ValueError(f"Version '{version.id}' already exists")
+
+        parent_id = version.parent_id
+        parent_node = self._by_id.get(parent_id) if parent_id is not None else None
+        splice = (
+            parent_node is not None
+            and not self._children.get(parent_id)
+            and version.id not in self._children   # no orphans waiting for this id
+        )
 
-    def _is_last_child(self, node_id: str) -> bool:
-        version = self._versions[node_id]
-        siblings = self._children.get(version.parent_id, [])
-        return not siblings or siblings[-1] == node_id
+        self._versions[version.id] = version
+        siblings = self._children[parent_id]
+        if siblings:
+            self._is_last[siblings[-1]] = False
+        siblings.append(version.id)
+        self._is_last[version.id] = True
+        if parent_id is None or parent_id not in self._versions:
+            self._roots.append(version.id)
+        if version.id in self._children:
+            # Former orphans now hang under the new version
+            self._roots = [
+                r for r in self._roots if self._versions[r].parent_id != version.id
+            ]
+
+        if not splice:
+            self._linearized_cache = None
+            self._by_id = {}
+            return
+
+        # Only child of its parent: it sits right after the parent in
+        # pre-order and is necessarily the last child.
+        _, corner_row = self._child_connectors(
+            parent_node.connectors, parent_node.is_last_child
+        )
+        node = LinearizedNode.model_construct(
+            version_id=version.id,
+            parent_id=parent_id,
+            depth=parent_node.depth + 1,
+            connectors=corner_row,
+            is_last_child=True,
+        )
+        index = next(
+            i for i, n in enumerate(self._linearized_cache) if n is parent_node
+        )
+        self._linearized_cache.insert(index + 1, node)
+        self._by_id[version.id] = node
 
     # ── Connector generation ─────────────────────────────────────────
 
     @staticmethod
-    def _build_connectors(
-        branch_open: list[bool],
-        depth: int,
-        is_last_child: bool,
-    ) -> list[str]:
+    def _child_connectors(
+        parent_connectors: tuple[str, ...],
+        parent_is_last: bool,
+    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
         """
-        Build the list of connector tokens for a node.
+        Build the (non-last child, last child) connector tuples for a node's children.
 
-        Example for depth=2, branch_open=[True, False]:
-            ["│", "└──", "•"]
-        """
-        if depth == 0:
-            return [NODE_DOT]
-
-        tokens: list[str] = []
-
-        # All ancestor levels: vertical line if that level's branch is still open
-        for open_flag in branch_open[:-1]:
-            tokens.append(VERTICAL if open_flag else SPACE)
+        Every child in the group shares the returned tuples; linearize()
+        additionally memoizes them per call across identical groups.
 
-        # Immediate parent connector
-        tokens.append(CORNER if is_last_child else TEE)
-
-        # Node indicator
-        tokens.append(NODE_DOT)
-        return tokens
\ No newline at end of file
+        Example for parent ("├──", "•") with more siblings below it:
+            (("│", "├──", "•"), ("│", "└──", "•"))
+        """
+        if len(parent_connectors) == 1:
+            # Children of a root: no upper levels to draw
+            prefix: tuple[str, ...] = ()
+        else:
+            # Parent's upper levels carry over; the parent's own level stays
+            # open (vertical line) only if the parent has siblings after it
+            prefix = parent_connectors[:-2] + (SPACE if parent_is_last else VERTICAL,)
+        return prefix + (TEE, NODE_DOT), prefix + (CORNER, NODE_DOT)
@@ -17,6 +17,7 @@ const state = {
   totalPages: 1,
   selected: null,        // currently selected version ID
   nodes: [],             // current page's LinearizedNode list
+  versions: {},          // version id → Version record for the current page
   highlightedIds: [],    // [selected, ...ancestors] — set directly from backend
 };
 
@@ -49,6 +50,7 @@ async function fetchPage(page) {
     state.page           = data.page;
     state.totalPages     = data.total_pages;
     state.nodes          = data.nodes;
+    state.versions       = data.versions || {};
     state.highlightedIds = data.highlighted_ids || []; // ← backend provides this
 
     metaEl.textContent = `${data.total_nodes} versions · page ${data.page} of ${data.total_pages}`;
@@ -65,13 +67,13 @@ async function fetchPage(page) {
 function renderRows() {
   tbody.innerHTML = "";
   for (const node of state.nodes) {
-    tbody.appendChild(buildRow(node));
+    tbody.appendChild(buildRow(node, state.versions[node.version_id]));
   }
 }
 
-function buildRow(node) {
+function buildRow(node, version) {
   const tr = document.createElement("tr");
-  const id = node.version.id;
+  const id = node.version_id;
 
   // selected gets its own class; ancestors share "ancestor"
   // note: highlightedIds includes the selected id too, so check selected first
@@ -101,17 +103,17 @@ function buildRow(node) {
   // ── Col 2: Version Name ──
   const tdName = document.createElement("td");
   tdName.className = "node-name";
-  tdName.textContent = node.version.name;
+  tdName.textContent = version.name;
 
   // ── Col 3: Description ──
   const tdDesc = document.createElement("td");
   tdDesc.className = "cell-author";   // reuse muted style
-  tdDesc.textContent = node.version.description || "—";
+  tdDesc.textContent = version.description || "—";
 
   // ── Col 4: Type badge (TRUNK / BRANCH / RELEASE) ──
   const tdType = document.createElement("td");
   const badge = document.createElement("span");
-  const t = (node.version.type || "TRUNK").toUpperCase();
+  const t = (version.type || "TRUNK").toUpperCase();
   const badgeClass = { TRUNK: "trunk", BRANCH: "branch", RELEASE: "release" }[t] || "default";
   badge.className = `badge badge-${badgeClass}`;
   badge.textContent = t;
@@ -120,12 +122,12 @@ function buildRow(node) {
   // ── Col 5: Submitted By ──
   const tdAuthor = document.createElement("td");
   tdAuthor.className = "cell-author";
-  tdAuthor.textContent = node.version.created_by;
+  tdAuthor.textContent = version.created_by;
 
   // ── Col 6: Created On ──
   const tdDate = document.createElement("td");
   tdDate.className = "cell-date";
-  tdDate.textContent = formatDate(node.version.created_at);
+  tdDate.textContent = formatDate(version.created_at);
 
   tr.append(tdTree, tdName, tdDesc, tdType, tdAuthor, tdDate);
   return tr;
@@ -0,0 +1,140 @@
+"""
+Tests for the FastAPI endpoints (served from the in-memory caches).
+Run with: pytest tests/test_api.py -v
+"""
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────
+
+@pytest.fixture(autouse=True)
+def sample_data():
+    # Endpoints mutate module-level state; start every test from the sample tree
+    main._load_sample_data()
+    yield
+    main._load_sample_data()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+IDENTITY = {"Accept-Encoding": "identity"}
+PAGE_1_IDS = ["v1", "v2", "v4", "v7", "v12", "v15", "v8", "v13", "v5", "v9"]
+PAGE_2_IDS = ["v3", "v6", "v10", "v11", "v14"]
+
+
+# ── Test: Unselected pages are the cached bytes ──────────────────────
+
+def test_versions_page_served_from_cache(client):
+    r = client.get("/versions?page=1", headers=IDENTITY)
+    assert r.status_code == 200
+    assert r.headers.get("content-encoding") is None
+    assert r.content == main._page_cache[0]
+
+    data = r.json()
+    assert [n["version_id"] for n in data["nodes"]] == PAGE_1_IDS
+    assert set(data["versions"]) == set(PAGE_1_IDS)
+    assert data["total_nodes"] == 15
+    assert data["total_pages"] == 2
+    assert data["selected_id"] is None
+    assert data["highlighted_ids"] == []
+
+
+# ── Test: Selection re-encodes the page with the ancestry path ───────
+
+def test_versions_selected_highlights_path(client):
+    plain = client.get("/versions?page=1").json()
+    r = client.get("/versions?page=1&selected=v13")
+    data = r.json()
+    assert data["selected_id"] == "v13"
+    # selected first, then its ancestors root → parent
+    assert data["highlighted_ids"] == ["v13", "v1", "v2", "v4", "v8"]
+    assert data["nodes"] == plain["nodes"]
+    assert data["versions"] == plain["versions"]
+
+
+def test_versions_unknown_selected_highlights_nothing(client):
+    data = client.get("/versions?page=1&selected=nope").json()
+    assert data["selected_id"] == "nope"
+    assert data["highlighted_ids"] == []
+
+
+# ── Test: Out-of-range pages clamp to the last page ──────────────────
+
+def test_versions_out_of_range_page_clamps(client):
+    data = client.get("/versions?page=99").json()
+    assert data["page"] == 2
+    assert [n["version_id"] for n in data["nodes"]] == PAGE_2_IDS
+
+
+# ── Test: Pre-compressed page is served with Content-Encoding ────────
+
+def test_versions_gzip_served_precompressed(client):
+    r = client.get("/versions?page=2", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert int(r.headers["content-length"]) == len(main._page_cache_gz[1])
+    assert r.content == main._page_cache[1]   # httpx decodes transparently
+
+
+# ── Test: Single version with ancestry ───────────────────────────────
+
+def test_version_detail(client):
+    r = client.get("/versions/v13")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["node"]["version_id"] == "v13"
+    assert [n["version_id"] for n in data["ancestry"]] == ["v1", "v2", "v4", "v8"]
+    assert set(data["versions"]) == {"v1", "v2", "v4", "v8", "v13"}
+
+    assert client.get("/versions/nope").status_code == 404
+
+
+# ── Test: Static assets answer conditional GETs with 304 ─────────────
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (main._JS_ETAG, 304),
+        (main._JS_ETAG.removeprefix("W/"), 304),   # strong form, weak comparison
+        ('"other", ' + main._JS_ETAG, 304),
+        ("*", 304),
+        ('"other"', 200),
+    ],
+)
+def test_asset_conditional_get(client, if_none_match, expected):
+    r = client.get("/static/js/app.js", headers={"If-None-Match": if_none_match})
+    assert r.status_code == expected
+    assert r.headers["etag"] == main._JS_ETAG
+    if expected == 304:
+        assert r.content == b""
+
+
+# ── Test: Append adds a version and rejects duplicates ───────────────
+
+def test_append_version(client):
+    new = {"id": "v16", "parent_id": "v15", "name": "Patch"}
+    r = client.post("/versions/append", json=new)
+    assert r.status_code == 200
+    assert r.json() == {"loaded": 16, "total_nodes": 16}
+    detail = client.get("/versions/v16").json()
+    assert detail["ancestry"][-1]["version_id"] == "v15"
+
+    assert client.post("/versions/append", json=new).status_code == 409
+
+
+# ── Test: NDJSON dump is routed ahead of /versions/{id} ──────────────
+
+def test_all_ndjson_streams_every_node(client):
+    r = client.get("/versions/all.ndjson")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    lines = [orjson.loads(line) for line in r.text.splitlines()]
+    assert [line["node"]["version_id"] for line in lines] == PAGE_1_IDS + PAGE_2_IDS
+    assert lines[0]["version"]["name"] == "Initial Release"
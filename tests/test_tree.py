@@ -19,10 +19,11 @@ def test_single_root():
     builder = TreeBuilder([make_version("v1")])
     nodes = builder.linearize()
     assert len(nodes) == 1
-    assert nodes[0].version.id == "v1"
+    assert nodes[0].version_id == "v1"
     assert nodes[0].depth == 0
-    assert nodes[0].connectors == [NODE_DOT]
-    assert nodes[0].ancestors == []
+    assert nodes[0].connectors == (NODE_DOT,)
+    assert nodes[0].parent_id is None
+    assert builder.ancestors_of("v1") == []
 
 
 # ── Test: Root with two children ─────────────────────────────────────
@@ -35,7 +36,7 @@ def test_root_with_two_children():
     ]
     builder = TreeBuilder(versions)
     nodes = builder.linearize()
-    ids = [n.version.id for n in nodes]
+    ids = [n.version_id for n in nodes]
     assert ids == ["root", "c1", "c2"]
 
     # c1 is NOT the last child — should use TEE
@@ -59,7 +60,7 @@ def test_dfs_order():
     ]
     builder = TreeBuilder(versions)
     nodes = builder.linearize()
-    ids = [n.version.id for n in nodes]
+    ids = [n.version_id for n in nodes]
     assert ids == ["root", "A", "A1", "B"]
 
 
@@ -79,7 +80,7 @@ def test_vertical_line_persists():
     ]
     builder = TreeBuilder(versions)
     nodes = builder.linearize()
-    a1 = next(n for n in nodes if n.version.id == "A1")
+    a1 = next(n for n in nodes if n.version_id == "A1")
     # At depth 2, connectors should be: [VERTICAL (root open), CORNER (last child), NODE_DOT]
     assert a1.connectors[0] == VERTICAL
     assert a1.connectors[1] == CORNER
@@ -97,8 +98,9 @@ def test_ancestry():
     ]
     builder = TreeBuilder(versions)
     nodes = builder.linearize()
-    a1a = next(n for n in nodes if n.version.id == "A1a")
-    assert a1a.ancestors == ["root", "A", "A1"]
+    a1a = next(n for n in nodes if n.version_id == "A1a")
+    assert a1a.parent_id == "A1"
+    assert builder.ancestors_of("A1a") == ["root", "A", "A1"]
 
 
 # ── Test: Space token when parent branch is closed ────────────────────
@@ -114,7 +116,7 @@ def test_space_when_branch_closed():
     ]
     builder = TreeBuilder(versions)
     nodes = builder.linearize()
-    a1 = next(n for n in nodes if n.version.id == "A1")
+    a1 = next(n for n in nodes if n.version_id == "A1")
     # root is closed (no more children after A), so SPACE at level 0
     assert a1.connectors[0] == SPACE
 
@@ -147,4 +149,86 @@ def test_orphan_becomes_root():
     assert len(nodes) == 2
     # Both treated as roots since parents are absent
     for n in nodes:
-        assert n.depth == 0
\ No newline at end of file
+        assert n.depth == 0
+        assert n.parent_id is None
+
+# ── Test: Deep chains do not hit the recursion limit ─────────────────
+
+def test_deep_chain_is_iterative():
+    depth = 5000
+    versions = [make_version("v0")] + [
+        make_version(f"v{i}", f"v{i - 1}") for i in range(1, depth)
+    ]
+    builder = TreeBuilder(versions)
+    nodes = builder.linearize()
+    assert len(nodes) == depth
+    assert nodes[-1].depth == depth - 1
+    assert nodes[-1].parent_id == f"v{depth - 2}"
+
+
+# ── Test: Lookup by id is served from the linearize() cache ──────────
+
+def test_lookup_uses_cache():
+    versions = [
+        make_version("root"),
+        make_version("A", "root"),
+    ]
+    builder = TreeBuilder(versions)
+    nodes = builder.linearize()
+    assert builder.linearize() is nodes
+    assert builder.lookup("A") is nodes[1]
+    assert builder.lookup("missing") is None
+
+
+# ── Test: add_version matches a full rebuild ─────────────────────────
+
+@pytest.mark.parametrize("new_parent", ["A1", "A", "B", "root", None, "gone"])
+def test_add_version_matches_rebuild(new_parent):
+    #   root
+    #   ├── A
+    #   │   └── A1
+    #   └── B
+    versions = [
+        make_version("root"),
+        make_version("A",  "root"),
+        make_version("A1", "A"),
+        make_version("B",  "root"),
+    ]
+    new = make_version("N", new_parent)
+    builder = TreeBuilder(versions)
+    builder.linearize()
+    builder.add_version(new)
+
+    expected = TreeBuilder(versions + [new]).linearize()
+    assert builder.linearize() == expected
+    assert builder.lookup("N") == next(n for n in expected if n.version_id == "N")
+
+
+def test_add_version_rejects_duplicate_id():
+    builder = TreeBuilder([make_version("root")])
+    with pytest.raises(ValueError):
+        builder.add_version(make_version("root"))
+
+
+# ── Test: created_at defaults to the construction time (UTC) ─────────
+
+def test_created_at_default_is_per_instance():
+    first = make_version("v1")
+    second = make_version("v2")
+    assert first.created_at.tzinfo is not None
+    assert second.created_at >= first.created_at
+    assert first.created_at is not second.created_at
+
+
+# ── Test: Siblings share connector tuples ────────────────────────────
+
+def test_siblings_share_connectors():
+    versions = [
+        make_version("root"),
+        make_version("c1", "root"),
+        make_version("c2", "root"),
+        make_version("c3", "root"),
+    ]
+    nodes = TreeBuilder(versions).linearize()
+    assert nodes[1].connectors is nodes[2].connectors
+    assert nodes[3].connectors == (CORNER, NODE_DOT)